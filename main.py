@@ -1,31 +1,40 @@
 from __future__ import annotations
 
 import os
-import json
+import sys
 import gzip
 import base64
+import binascii
 import time
+import hashlib
 import logging
-import markdown2
-from datetime import datetime
-from dataclasses import dataclass, asdict
-from heapq import heappush, heappushpop
+import struct
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from heapq import nlargest
+from itertools import chain
 from typing import Optional, Final, TypeAlias, List, Iterator, Tuple
-from functools import wraps
+from functools import lru_cache
+from html import escape as html_escape
 from flask import (
     Flask,
     Response,
     request,
-    render_template_string,
-    make_response,
     send_from_directory,
     redirect,
+    stream_with_context,
 )
-from anthropic import Anthropic, RateLimitError
-from urllib.parse import urlparse
+from anthropic import Anthropic, MessageStream, RateLimitError
+from cachetools import TTLCache
+from flask_compress import Compress
 from werkzeug.middleware.proxy_fix import ProxyFix
+import orjson
+import zstandard as zstd
 from typing_extensions import TypeGuard
 from google.cloud import storage
+from google.api_core.exceptions import PreconditionFailed
+from google.cloud.exceptions import NotFound
 
 # Type definitions
 HTMLResponse: TypeAlias = Tuple[str, int]
@@ -48,15 +57,7 @@ class Config:
 class CachedResult:
     title: str
     summary: str  # Markdown format
-
-
-@dataclass(frozen=True)
-class SummaryEntry:
-    url: str
-    timestamp: datetime
-
-    def __lt__(self, other: SummaryEntry) -> bool:
-        return self.timestamp < other.timestamp
+    html: Optional[str] = None  # Pre-rendered; absent in older blobs
 
 
 HTML_TEMPLATE = """
@@ -163,20 +164,7 @@ LIST_TEMPLATE = """
                         </tr>
                     </thead>
                     <tbody class="bg-white divide-y divide-gray-200">
-                        {% for summary in summaries %}
-                        <tr class="hover:bg-gray-50 transition-colors" id="row-{{ loop.index }}">
-                            <td class="px-6 py-4 whitespace-nowrap text-sm text-gray-500" data-utc-time="{{ summary.timestamp }}">{{ summary.timestamp }}</td>
-                            <td class="px-6 py-4 text-sm">
-                                <a href="/{{ summary.encoded_url }}" class="text-indigo-600 hover:text-indigo-900">{{ summary.title }}</a>
-                            </td>
-                            <td class="px-6 py-4 whitespace-nowrap text-right text-sm font-medium">
-                                <button onclick="deleteSummary('{{ summary.encoded_url }}', document.getElementById('row-{{ loop.index }}'))" 
-                                        class="text-red-600 hover:text-red-900 transition-colors">
-                                    Delete
-                                </button>
-                            </td>
-                        </tr>
-                        {% endfor %}
+                        <!--ROWS-->
                     </tbody>
                 </table>
             </div>
@@ -186,9 +174,35 @@ LIST_TEMPLATE = """
 </html>
 """
 
-SUMMARY_PROMPT = """
-<content>{content}</content>
+# Shell for progressively streamed summaries: the prefix is flushed
+# right away, raw Markdown chunks are appended into the <pre> as they
+# arrive, and the suffix swaps to the canonical rendered page.
+STREAM_PREFIX = """<!DOCTYPE html>
+<html>
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <link rel="icon" type="image/png" href="/favicon.png">
+    <title>{title}</title>
+    <script src="https://cdn.tailwindcss.com"></script>
+</head>
+<body class="bg-gray-50">
+    <div class="max-w-4xl mx-auto p-4 sm:p-6 lg:p-8">
+        <h1 class="text-2xl font-bold text-gray-900 mb-4">{title}</h1>
+        <div class="text-gray-600 mb-6">Summarizing&hellip; the finished page loads automatically.</div>
+        <div class="bg-white rounded-lg shadow-sm p-6">
+            <pre class="whitespace-pre-wrap text-sm text-gray-700">"""
 
+STREAM_SUFFIX = """</pre>
+        </div>
+    </div>
+    <script>window.location.replace("/{encoded_url}");</script>
+</body>
+</html>"""
+
+# Static instruction block, sent as a cacheable system prompt so repeat
+# calls within the cache TTL skip re-processing it server-side.
+SUMMARY_INSTRUCTIONS = """
 Transform this content into an in-depth technical narrative that combines technical depth with the personality and insights from the original conversation. Write for a knowledgeable audience that wants both rich technical detail and the human story behind the innovations.
 
 When describing technical innovations, combine thorough technical explanation with the speaker's perspective on why these choices matter. Maintain the original voice and personality while diving deep into the most compelling technical aspects. Begin directly with the content.
@@ -216,7 +230,29 @@ Writing style:
 - Connected ideas rather than isolated points
 """
 
-MARKDOWN_EXTRAS = ["break-on-newline", "cuddled-lists", "markdown-in-html", "tables"]
+try:
+    import cmarkgfm
+    from cmarkgfm.cmark import Options as cmarkgfmOptions
+
+    # Summaries are trusted Claude output, so raw HTML passthrough is fine;
+    # HARDBREAKS preserves markdown2's "break-on-newline" behavior.
+    _CMARK_OPTIONS = (
+        cmarkgfmOptions.CMARK_OPT_HARDBREAKS | cmarkgfmOptions.CMARK_OPT_UNSAFE
+    )
+
+    def render_markdown(text: str) -> str:
+        """Render Markdown to HTML using the cmark C extension"""
+        return cmarkgfm.github_flavored_markdown_to_html(text, options=_CMARK_OPTIONS)
+
+except ImportError:  # Fall back to pure-Python markdown2 for source-only installs
+    import markdown2
+
+    MARKDOWN_EXTRAS = ["break-on-newline", "cuddled-lists", "markdown-in-html", "tables"]
+
+    def render_markdown(text: str) -> str:
+        """Render Markdown to HTML using markdown2"""
+        return markdown2.markdown(text, extras=MARKDOWN_EXTRAS)
+
 
 app = Flask(__name__)
 app.wsgi_app = ProxyFix(app.wsgi_app, x_proto=1, x_host=1)
@@ -224,197 +260,675 @@ app.wsgi_app = ProxyFix(app.wsgi_app, x_proto=1, x_host=1)
 # Allow large POST requests
 app.config["MAX_FORM_MEMORY_SIZE"] = 16 * 1024 * 1024  # 16 MB
 
+# Negotiate response compression in middleware (brotli when the client
+# supports it, gzip otherwise). Streamed responses are compressed
+# incrementally, chunk by chunk, so the progressive summary pages keep
+# their time-to-first-byte.
+app.config["COMPRESS_ALGORITHM"] = ["br", "gzip"]
+app.config["COMPRESS_LEVEL"] = 7
+app.config["COMPRESS_MIN_SIZE"] = 500
+Compress(app)
+
+# Compile templates once at import time; render_template_string would
+# re-parse or at least re-hash and look up the source on every request.
+_HTML_TMPL = app.jinja_env.from_string(HTML_TEMPLATE)
+
+# The /recent page is a static shell around a table body; its rows are
+# emitted with str.format and a single join rather than a Jinja loop,
+# which pays per-row attribute lookups and autoescape dispatch. Split
+# the shell once at import.
+_LIST_HEAD, _LIST_TAIL = LIST_TEMPLATE.split("<!--ROWS-->")
+
+_ROW_FMT = """<tr class="hover:bg-gray-50 transition-colors" id="row-{index}">
+                            <td class="px-6 py-4 whitespace-nowrap text-sm text-gray-500" data-utc-time="{timestamp}">{timestamp}</td>
+                            <td class="px-6 py-4 text-sm">
+                                <a href="/{encoded_url}" class="text-indigo-600 hover:text-indigo-900">{title}</a>
+                            </td>
+                            <td class="px-6 py-4 whitespace-nowrap text-right text-sm font-medium">
+                                <button onclick="deleteSummary('{encoded_url}', document.getElementById('row-{index}'))"
+                                        class="text-red-600 hover:text-red-900 transition-colors">
+                                    Delete
+                                </button>
+                            </td>
+                        </tr>
+"""
+
+# Common error pages never change, so render them once at import time;
+# serving one involves no template work, and the compression middleware
+# handles encoding negotiation.
+_INVALID_URL_PAGE = _HTML_TMPL.render(error="Invalid URL. Must be HTTPS.", title="Error")
+_NOT_FOUND_PAGE = _HTML_TMPL.render(error="Summary not found", title="Error")
+
+
+def static_error_response(page: str, status: int) -> Response:
+    """Serve a pre-rendered error page"""
+    return Response(page, status, mimetype="text/html")
+
+
 storage_client = storage.Client()
 config = Config(
     claude_api_key=os.environ["CLAUDE_API_KEY"],
     bucket_name=os.environ["BUCKET_NAME"],
 )
 
+# Module-level client so the underlying HTTP connection pool (and its TLS
+# sessions) are reused across requests instead of re-created per call.
+anthropic_client = Anthropic(api_key=config.claude_api_key, max_retries=2)
+
 
+# The URL/blob-name helpers below are pure string transforms that run
+# several times per request, so memoize them behind bounded LRUs.
+@lru_cache(maxsize=4096)
 def encode_url_safe(url: str) -> str:
     """Encode URL to base64 for use in paths"""
     encoded = base64.urlsafe_b64encode(url.encode())
     return encoded.decode()  # Keep padding
 
 
+_B64URL_TO_STD = bytes.maketrans(b"-_", b"+/")
+
+
+def fast_b64url_decode(encoded: str) -> str:
+    """Decode a base64url token with a single C-level binascii call.
+
+    base64.urlsafe_b64decode goes through several Python-level wrappers;
+    translating the alphabet on bytes and calling binascii directly
+    avoids that overhead on paths that decode many tokens.
+    """
+    data = encoded.encode("ascii").translate(_B64URL_TO_STD)
+    return binascii.a2b_base64(data + b"=" * (-len(data) % 4)).decode("utf-8")
+
+
+@lru_cache(maxsize=4096)
 def decode_url_safe(encoded: str) -> str:
     """Decode base64 URL back to original"""
     try:
-        # Add padding if needed
-        padding_needed = len(encoded) % 4
-        if padding_needed:
-            encoded += "=" * (4 - padding_needed)
-        return base64.urlsafe_b64decode(encoded).decode()
+        return fast_b64url_decode(encoded)
     except Exception as e:
         logger.error(f"Failed to decode base64 URL: {encoded}, error: {e}")
         raise ValueError(f"Invalid base64-encoded URL: {encoded}")
 
 
-def gzip_response(f):
-    @wraps(f)
-    def decorated_function(*args, **kwargs) -> Response:
-        content: Response = f(*args, **kwargs)
-        if not isinstance(content, str):
-            return content
-
-        if "gzip" not in request.headers.get("Accept-Encoding", "").lower():
-            return Response(content)
-
-        response = make_response(gzip.compress(content.encode("utf-8")))
-        response.headers["Content-Encoding"] = "gzip"
-        response.headers["Vary"] = "Accept-Encoding"
-        response.headers["Content-Length"] = len(response.data)
-        return response
+@lru_cache(maxsize=4096)
+def get_blob_name(url: URL) -> str:
+    """Generate a fixed-length blob name by hashing the URL.
 
-    return decorated_function
+    Base64-encoding the full URL produced names of unbounded length
+    (GCS caps them at 1024 bytes) and bloated list pages; a truncated
+    SHA-256 digest keeps them short and uniform. The original URL is
+    kept in blob metadata and in the index blob.
+    """
+    return hashlib.sha256(url.encode()).hexdigest()[:32] + ".gz"
 
 
-def get_blob_name(url: URL) -> str:
-    """Generate blob name from URL using base64"""
+@lru_cache(maxsize=4096)
+def legacy_blob_name(url: URL) -> str:
+    """Blob name under the original base64 naming scheme"""
     return f"{encode_url_safe(url)}.gz"
 
 
-def url_from_blob_name(blob_name: str) -> URL:
-    """Extract URL from blob name"""
-    return decode_url_safe(blob_name[:-3])  # remove .gz
-
-
+@lru_cache(maxsize=4096)
 def is_valid_https_url(url: str) -> TypeGuard[URL]:
     """Validate that a string is a proper HTTPS URL"""
-    try:
-        parsed = urlparse(url)
-        return parsed.scheme == "https" and bool(parsed.netloc)
-    except Exception:
+    # Equivalent to checking scheme/netloc via urlparse, but with plain
+    # string operations - this runs on every request.
+    if not url.startswith("https://"):
         return False
+    rest = url[8:]
+    end = len(rest)
+    for sep in "/?#":
+        idx = rest.find(sep)
+        if 0 <= idx < end:
+            end = idx
+    netloc = rest[:end]
+    return bool(netloc) and not any(c.isspace() for c in netloc)
+
+
+@lru_cache(maxsize=4096)
+def _normalize_url(url: str) -> Optional[URL]:
+    """Prefix a missing scheme and validate; pure, so memoized above"""
+    if not url.startswith("https://"):
+        url = "https://" + url
+    return url if is_valid_https_url(url) else None
 
 
 def get_and_validate_url(url: str) -> Optional[URL]:
     """Validate that a string is a proper HTTPS URL"""
-    try:
-        if not url.startswith("https://"):
-            url = "https://" + url
-        if not is_valid_https_url(url):
-            logger.warning(f"URL validation failed: {url}")
-            return None
-        logger.info(f"URL validated: {url}")
-        return url
-    except Exception as e:
-        logger.warning(f"URL validation error: {e}")
-        return None
+    normalized = _normalize_url(url)
+    if normalized is None:
+        logger.warning(f"URL validation failed: {url}")
+    return normalized
 
 
-def list_blobs_by_page(bucket: storage.Bucket) -> Iterator[storage.Blob]:
-    """Iterator over all blobs, paginated to control memory usage"""
-    page_token = None
-    page_count = 0
-    while True:
+def list_blobs_by_page(
+    bucket: storage.Bucket, prefix: Optional[str] = None
+) -> Iterator[storage.Blob]:
+    """Iterator over blobs (optionally under a prefix), paginated to
+    control memory usage.
+
+    The next page is prefetched in a background thread while the caller
+    processes the current one, hiding the per-page round-trip latency.
+    """
+
+    def fetch_page(
+        page_token: Optional[str],
+    ) -> Tuple[List[storage.Blob], Optional[str]]:
         blob_list = bucket.list_blobs(
             max_results=1000,
             page_token=page_token,
-            fields="items(name,timeCreated),nextPageToken",
+            prefix=prefix,
+            fields="items(name,timeCreated,metadata),nextPageToken",
         )
+        return list(blob_list), blob_list.next_page_token
 
-        for blob in blob_list:
-            yield blob
+    page_count = 0
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        future = executor.submit(fetch_page, None)
+        while future is not None:
+            blobs, page_token = future.result()
+            # Request the next page before handing this one to the caller.
+            future = executor.submit(fetch_page, page_token) if page_token else None
 
-        page_token = blob_list.next_page_token
-        page_count += 1
-        logger.debug(f"Processed page {page_count} of blob listing")
+            yield from blobs
+            page_count += 1
+            logger.debug(f"Processed page {page_count} of blob listing")
 
-        if not page_token:
-            break
 
+# Manifest of (encoded_url, timestamp, title) entries so /recent reads a
+# single small blob instead of listing the whole bucket.
+INDEX_BLOB_NAME = "index.json.gz"
+_INDEX_MAX_ENTRIES = 2000
 
-def get_recent_summaries(max_entries: int = 1000) -> List[Tuple[str, str]]:
-    """Get the most recent summaries, properly paginated"""
-    bucket = storage_client.bucket(config.bucket_name)
-    recent_heap: List[SummaryEntry] = []
-    total_processed = 0
 
-    try:
-        for blob in list_blobs_by_page(bucket):
-            if (
-                blob.name is None
-                or not blob.name.endswith(".gz")
-                or blob.time_created is None
-            ):
-                continue
+def _update_index(mutate) -> None:
+    """Read-modify-write the index blob with optimistic concurrency.
 
-            total_processed += 1
-            entry = SummaryEntry(
-                url=url_from_blob_name(blob.name), timestamp=blob.time_created
+    `mutate` receives the current entry list and returns the new one.
+    Concurrent writers are handled via generation preconditions: on a
+    lost race the update is retried against the fresh index.
+    """
+    bucket = storage_client.bucket(config.bucket_name)
+    for attempt in range(5):
+        blob = bucket.blob(INDEX_BLOB_NAME)
+        try:
+            blob.reload()
+            generation = blob.generation
+            payload = blob.download_as_bytes(if_generation_match=generation)
+            if payload[:2] == b"\x1f\x8b":
+                payload = gzip.decompress(payload)
+            entries = orjson.loads(payload)
+        except NotFound:
+            generation = 0  # precondition: blob must not exist yet
+            entries = []
+        except PreconditionFailed:
+            # Another writer replaced the index between reload() and the
+            # download; re-read against the fresh generation.
+            logger.warning(f"Index read raced, retrying (attempt {attempt + 1})")
+            continue
+
+        entries = mutate(entries)[-_INDEX_MAX_ENTRIES:]
+        compressed = gzip.compress(orjson.dumps(entries))
+        try:
+            blob.upload_from_string(
+                compressed,
+                content_type="application/json",
+                if_generation_match=generation,
             )
+            return
+        except PreconditionFailed:
+            logger.warning(f"Index update raced, retrying (attempt {attempt + 1})")
 
-            if len(recent_heap) < max_entries:
-                heappush(recent_heap, entry)
-            else:
-                heappushpop(recent_heap, entry)
+    logger.error("Giving up on index update after repeated generation races")
 
-        sorted_entries = sorted(recent_heap, key=lambda x: x.timestamp, reverse=True)
-        logger.info(
-            f"Processed {total_processed} entries, returning {len(sorted_entries)} most recent"
+
+def add_index_entry(url: URL) -> None:
+    """Record a freshly stored summary in the index blob"""
+    encoded_url = encode_url_safe(url)
+    title = url[8:-1] if url.endswith("/") else url[8:]
+    entry = {"encoded_url": encoded_url, "ts": time.time(), "title": title}
+
+    def mutate(entries: List[dict]) -> List[dict]:
+        entries = [e for e in entries if e["encoded_url"] != encoded_url]
+        entries.append(entry)
+        return entries
+
+    _update_index(mutate)
+
+
+def remove_index_entry(url: URL) -> None:
+    """Drop a deleted summary from the index blob"""
+    encoded_url = encode_url_safe(url)
+    _update_index(
+        lambda entries: [e for e in entries if e["encoded_url"] != encoded_url]
+    )
+
+
+def rebuild_index() -> None:
+    """Rebuild the index blob from a full bucket scan.
+
+    Bootstrap/repair tool for deployments whose bucket predates the
+    index blob; run with `python main.py --rebuild-index`.
+    """
+    bucket = storage_client.bucket(config.bucket_name)
+    candidates = (
+        (blob.time_created, blob.name, (blob.metadata or {}).get("url"))
+        for blob in list_blobs_by_page(bucket)
+        if blob.name is not None
+        and blob.name.endswith(".gz")
+        and blob.name != INDEX_BLOB_NAME
+        and blob.time_created is not None
+    )
+    # Index entries are stored oldest-first, newest appended at the end.
+    entries = []
+    for timestamp, name, meta_url in reversed(nlargest(_INDEX_MAX_ENTRIES, candidates)):
+        url = meta_url if meta_url else fast_b64url_decode(name[:-3])
+        entries.append(
+            {
+                "encoded_url": encode_url_safe(url),
+                "ts": timestamp.timestamp(),
+                "title": url[8:-1] if url.endswith("/") else url[8:],
+            }
         )
+    _update_index(lambda _: entries)
+    logger.info(f"Rebuilt index with {len(entries)} entries")
 
-        return [
-            (entry.url, entry.timestamp.strftime("%Y-%m-%d %H:%M UTC"))
-            for entry in sorted_entries
-        ]
+
+def get_recent_summaries(max_entries: int = 1000) -> List[Tuple[str, str, str]]:
+    """Get the most recent summaries from the index blob.
+
+    Falls back to a full bucket scan when the index doesn't exist yet
+    (pre-index deployments); store_result creates it on the next write.
+    """
+    bucket = storage_client.bucket(config.bucket_name)
+    blob = bucket.blob(INDEX_BLOB_NAME)
+    try:
+        payload = blob.download_as_bytes()
+    except NotFound:
+        logger.warning("Summary index missing, falling back to bucket scan")
+        return scan_recent_summaries(max_entries)
+    except Exception as e:
+        logger.error(f"Error reading summary index: {e}", exc_info=True)
+        return []
+
+    if payload[:2] == b"\x1f\x8b":
+        payload = gzip.decompress(payload)
+    entries = orjson.loads(payload)
+
+    # Entries are appended in write order, so the newest are at the end.
+    return [
+        (
+            entry["encoded_url"],
+            time.strftime("%Y-%m-%d %H:%M UTC", time.gmtime(entry["ts"])),
+            entry["title"],
+        )
+        for entry in reversed(entries[-max_entries:])
+    ]
+
+
+# Every blob name falls under one of these prefixes: hashed names start
+# with a hex nibble, and legacy names (base64 of "https://...") start
+# with "aHR0cHM6", which the "a" shard already covers. Listing the
+# shards in parallel exploits GCS's per-prefix listing throughput; the
+# prefixes are disjoint, so no blob is listed twice.
+_SCAN_PREFIXES = tuple("0123456789abcdef")
+
+
+def scan_recent_summaries(max_entries: int = 1000) -> List[Tuple[str, str, str]]:
+    """Get the most recent summaries by scanning the bucket, paginated"""
+    bucket = storage_client.bucket(config.bucket_name)
+
+    try:
+        # Plain tuples compare at C level inside nlargest; (timestamp,
+        # name) is unique, so the metadata URL in the third slot is never
+        # compared. Each shard keeps only its own top-K, bounding memory.
+        def scan_prefix(prefix: str) -> List[Tuple]:
+            return nlargest(
+                max_entries,
+                (
+                    (blob.time_created, blob.name, (blob.metadata or {}).get("url"))
+                    for blob in list_blobs_by_page(bucket, prefix=prefix)
+                    if blob.name is not None
+                    and blob.name.endswith(".gz")
+                    and blob.name != INDEX_BLOB_NAME
+                    and blob.time_created is not None
+                ),
+            )
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            shards = list(executor.map(scan_prefix, _SCAN_PREFIXES))
+        recent = nlargest(max_entries, chain.from_iterable(shards))
+        logger.info(f"Returning {len(recent)} most recent entries")
+
+        # nlargest already returns entries sorted newest-first. Decode and
+        # format only these top-K survivors, as (encoded_url, timestamp,
+        # display_title) tuples ready for the template. Hashed blob names
+        # carry the URL in metadata; legacy names are base64 of the URL.
+        results = []
+        for timestamp, name, meta_url in recent:
+            url = meta_url if meta_url else fast_b64url_decode(name[:-3])
+            # Stored URLs are always https:// and validation guarantees it,
+            # so slice the prefix (and any trailing slash) directly.
+            title = url[8:-1] if url.endswith("/") else url[8:]
+            results.append(
+                (encode_url_safe(url), timestamp.strftime("%Y-%m-%d %H:%M UTC"), title)
+            )
+        return results
 
     except Exception as e:
         logger.error(f"Error listing summaries: {e}", exc_info=True)
         return []
 
 
-def store_result(url: URL, title: str, summary: str) -> None:
+# Version tags for the binary cache-blob format; legacy blobs are JSON
+# objects and therefore start with "{". Version 2 appends the
+# pre-rendered HTML after the Markdown summary.
+_PACK_V1 = b"\x01"
+_PACK_V2 = b"\x02"
+
+# Cache blobs are zstd-compressed: faster to compress and decompress
+# than gzip at a similar ratio. Reuse (de)compressor contexts, which
+# are cheap to share and avoid per-call setup. Blobs are written once
+# and read many times, so spend a higher level on the write; zstd
+# decompression speed is unaffected by level.
+_zstd_compressor = zstd.ZstdCompressor(level=10)
+_zstd_decompressor = zstd.ZstdDecompressor()
+
+_ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+
+
+def _decompress_payload(payload: bytes) -> bytes:
+    """Decompress a cache blob, dispatching on the payload magic.
+
+    New blobs are zstd; blobs from older deployments are either raw
+    gzip or, when written with Content-Encoding set, already
+    decompressed by the storage client on download.
+    """
+    if payload[:4] == _ZSTD_MAGIC:
+        return _zstd_decompressor.decompress(payload)
+    if payload[:2] == b"\x1f\x8b":
+        return gzip.decompress(payload)
+    return payload
+
+
+def pack_result(result: CachedResult) -> bytes:
+    """Serialize a CachedResult as a length-prefixed binary payload.
+
+    Avoids JSON escaping/parsing of multi-KB Markdown on every cache
+    read and write: a version byte, then length-prefixed UTF-8 fields
+    (the last field runs to the end of the payload).
+    """
+    title = result.title.encode("utf-8")
+    summary = result.summary.encode("utf-8")
+    if result.html is None:
+        return b"".join((_PACK_V1, struct.pack("<I", len(title)), title, summary))
+    return b"".join(
+        (
+            _PACK_V2,
+            struct.pack("<I", len(title)),
+            title,
+            struct.pack("<I", len(summary)),
+            summary,
+            result.html.encode("utf-8"),
+        )
+    )
+
+
+def unpack_result(payload: bytes) -> CachedResult:
+    """Parse a cache blob, accepting all binary versions and legacy JSON"""
+    if payload[:1] == b"{":
+        return CachedResult(**orjson.loads(payload))
+    version = payload[:1]
+    if version not in (_PACK_V1, _PACK_V2):
+        raise ValueError("Unknown cached-result format")
+    (title_len,) = struct.unpack_from("<I", payload, 1)
+    offset = 5 + title_len
+    title = payload[5:offset].decode("utf-8")
+    if version == _PACK_V1:
+        return CachedResult(title=title, summary=payload[offset:].decode("utf-8"))
+    (summary_len,) = struct.unpack_from("<I", payload, offset)
+    summary_end = offset + 4 + summary_len
+    return CachedResult(
+        title=title,
+        summary=payload[offset + 4 : summary_end].decode("utf-8"),
+        html=payload[summary_end:].decode("utf-8"),
+    )
+
+
+# Process-local tier in front of GCS: repeated lookups of the same URL
+# (bots, link previews, the post-generation redirect) become dict hits
+# instead of storage round-trips. Best-effort per instance, like
+# _render_cache below, so the TTL bounds cross-instance staleness.
+_result_cache: TTLCache = TTLCache(
+    maxsize=int(os.environ.get("RESULT_CACHE_SIZE", "512")),
+    ttl=int(os.environ.get("RESULT_CACHE_TTL", "3600")),
+)
+_result_cache_lock = threading.Lock()
+
+
+def prepare_result(url: URL, title: str, summary: str) -> CachedResult:
+    """Render a result and make it servable from this instance.
+
+    Runs synchronously on the request path so coalesced waiters and the
+    post-generation redirect find the summary in the memory tier even
+    while the GCS write is still pending in the background.
+    """
+    # Render to HTML once at write time; every read serves it verbatim.
+    result = CachedResult(title=title, summary=summary, html=render_markdown(summary))
+    with _result_cache_lock:
+        _result_cache[url] = result
+    # Drop any stale rendered copy so views pick up the fresh summary
+    # immediately.
+    with _render_cache_lock:
+        _render_cache.pop(url, None)
+    return result
+
+
+def store_result(url: URL, result: CachedResult) -> None:
     """Store a compressed result in Cloud Storage"""
     bucket = storage_client.bucket(config.bucket_name)
     blob_name = get_blob_name(url)
     blob = bucket.blob(blob_name)
 
-    result = CachedResult(title=title, summary=summary)
-
-    # Compress and store
-    compressed = gzip.compress(json.dumps(asdict(result)).encode("utf-8"))
-    blob.upload_from_string(compressed)
+    # The blob name is a hash, so keep the URL recoverable via metadata.
+    blob.metadata = {"url": url}
+    blob.cache_control = "public, max-age=31536000, immutable"
+    compressed = _zstd_compressor.compress(pack_result(result))
+    blob.upload_from_string(compressed, content_type="application/zstd")
+    with _render_cache_lock:
+        _render_cache.pop(url, None)
+    add_index_entry(url)
+    _invalidate_recent_page()
     logger.info(f"Stored result for {url} in {blob_name}")
 
 
 def get_cached_result(url: URL) -> Optional[CachedResult]:
-    """Try to get a cached result from Cloud Storage"""
+    """Try to get a cached result, preferring the in-process tier over GCS"""
+    with _result_cache_lock:
+        result = _result_cache.get(url)
+    if result is not None:
+        return result
     try:
         bucket = storage_client.bucket(config.bucket_name)
-        blob_name = get_blob_name(url)
-        blob = bucket.blob(blob_name)
 
-        if not blob.exists():
-            logger.debug(f"Cache miss for {url}")
-            return None
-
-        # Decompress and parse
-        compressed_data = blob.download_as_bytes()
-        data = json.loads(gzip.decompress(compressed_data))
+        # Download directly and treat NotFound as a miss, rather than
+        # paying a separate exists() round-trip first. Summaries stored
+        # before the hashed naming scheme live under their base64 name.
+        try:
+            payload = bucket.blob(get_blob_name(url)).download_as_bytes()
+        except NotFound:
+            try:
+                payload = bucket.blob(legacy_blob_name(url)).download_as_bytes()
+            except NotFound:
+                logger.debug(f"Cache miss for {url}")
+                return None
+
+        result = unpack_result(_decompress_payload(payload))
+        # Misses are deliberately not cached: a concurrent generation may
+        # finish at any moment and should become visible immediately.
+        with _result_cache_lock:
+            _result_cache[url] = result
         logger.info(f"Cache hit for {url}")
-        return CachedResult(**data)
+        return result
     except Exception as e:
         logger.error(f"Error retrieving cached result: {e}", exc_info=True)
         return None
 
 
-def summarize_with_claude(content: str) -> str:
-    """Summarize content using Claude"""
-    client = Anthropic(api_key=config.claude_api_key)
-
-    response = client.messages.create(
-        model="claude-sonnet-4-0",
-        max_tokens=20000,
-        thinking={"type": "enabled", "budget_tokens": 10000},
-        messages=[{"role": "user", "content": SUMMARY_PROMPT.format(content=content)}],
+# Per-URL cache of rendered summaries. Entries also expire after a TTL:
+# store/delete only clear the cache of the instance that served them, so
+# other Cloud Run instances must age their copies out on their own.
+_render_cache: TTLCache = TTLCache(
+    maxsize=int(os.environ.get("RENDER_CACHE_SIZE", "512")),
+    ttl=int(os.environ.get("RENDER_CACHE_TTL", "3600")),
+)
+_render_cache_lock = threading.Lock()
+
+
+def get_rendered_summary(url: URL) -> Optional[Tuple[str, str]]:
+    """Fetch and render a stored summary as (title, html), memoized per URL.
+
+    The stored summary is immutable between writes, so cache hits skip the
+    GCS download, gzip decompression, JSON parse and Markdown render.
+    Invalidated per key by store_result and delete_summary, and capped
+    at RENDER_CACHE_TTL seconds for cross-instance staleness. Misses
+    are never cached, same as in get_cached_result: a summary must
+    become visible the moment a concurrent generation finishes.
+    """
+    with _render_cache_lock:
+        rendered = _render_cache.get(url)
+    if rendered is not None:
+        return rendered
+    cached = get_cached_result(url)
+    if not cached:
+        return None
+    # Blobs written before HTML was stored at write time still need a
+    # render here.
+    rendered = (cached.title, cached.html or render_markdown(cached.summary))
+    with _render_cache_lock:
+        _render_cache[url] = rendered
+    return rendered
+
+
+def _summary_request_params(content: str) -> dict:
+    """Model parameters shared by the streaming and batch paths"""
+    return {
+        "model": "claude-sonnet-4-0",
+        "max_tokens": 20000,
+        "thinking": {"type": "enabled", "budget_tokens": 10000},
+        "system": [
+            {
+                "type": "text",
+                "text": SUMMARY_INSTRUCTIONS,
+                "cache_control": {"type": "ephemeral"},
+            }
+        ],
+        "messages": [{"role": "user", "content": f"<content>{content}</content>"}],
+    }
+
+
+def open_summary_stream(content: str) -> MessageStream:
+    """Start a summary generation and return the open stream.
+
+    Called from the request handler before any response bytes are sent:
+    the API request happens here, so request-time failures such as rate
+    limits raise in the handler and still render a proper error page
+    instead of dying mid-stream on an HTTP 200.
+    """
+    # The SDK only issues the request when the manager is entered.
+    return anthropic_client.messages.stream(
+        **_summary_request_params(content),
         timeout=config.claude_timeout,
+    ).__enter__()
+
+
+def stream_summary_text(stream: MessageStream) -> Iterator[str]:
+    """Yield summary text chunks from an open Claude stream.
+
+    Streaming keeps the connection actively consumed for the whole
+    generation instead of idling on one long blocking request (which
+    the SDK limits for large max_tokens).
+    """
+    try:
+        yield from stream.text_stream
+        response = stream.get_final_message()
+    finally:
+        stream.close()
+
+    usage = response.usage
+    logger.info(
+        f"Prompt cache usage: {usage.cache_read_input_tokens} tokens read, "
+        f"{usage.cache_creation_input_tokens} tokens written"
     )
 
-    text_blocks = [block for block in response.content if block.type == "text"]
-    assert text_blocks
-    return text_blocks[0].text
+
+# Dogpile protection: URLs with a generation currently in flight, so N
+# concurrent misses for the same URL run one Claude pipeline, not N.
+_inflight: dict[str, threading.Event] = {}
+_inflight_lock = threading.Lock()
+
+
+def _release_inflight(url: URL) -> None:
+    """Wake any requests coalesced onto a generation of this URL.
+
+    They re-check the cache and report accordingly, so this is safe to
+    call whether the generation succeeded or failed.
+    """
+    with _inflight_lock:
+        event = _inflight.pop(url, None)
+    if event is not None:
+        event.set()
+
+# The GCS upload after a generation is not on the user's critical path;
+# run it here so the final redirect is sent without waiting for the PUT.
+_store_executor = ThreadPoolExecutor(max_workers=4)
+
+
+def _log_store_failure(future) -> None:
+    e = future.exception()
+    if e is not None:
+        logger.error(f"Background store_result failed: {e}", exc_info=e)
+
+
+def stream_new_summary(
+    target_url: URL, title: str, stream: MessageStream
+) -> Iterator[str]:
+    """Stream a new summary to the browser while it is generated.
+
+    Emits a page shell immediately, appends the HTML-escaped Markdown
+    chunk by chunk as Claude produces it, then stores the result and
+    swaps to the canonical summary page. First content reaches the
+    browser within about a second instead of after the full generation.
+    """
+    try:
+        yield STREAM_PREFIX.format(title=html_escape(title))
+        parts: List[str] = []
+        try:
+            for text in stream_summary_text(stream):
+                parts.append(text)
+                yield html_escape(text)
+        except Exception as e:
+            logger.error(
+                f"Error streaming summary for {target_url}: {e}", exc_info=True
+            )
+            yield (
+                f"\n\nError generating summary: {html_escape(str(e))}"
+                "</pre></div></div></body></html>"
+            )
+            return
+
+        # Populate the memory tier synchronously: coalesced waiters wake
+        # on the event set below and must find the result immediately,
+        # before the background GCS write has even started.
+        result = prepare_result(target_url, title, "".join(parts))
+        _store_executor.submit(store_result, target_url, result).add_done_callback(
+            _log_store_failure
+        )
+        yield STREAM_SUFFIX.format(encoded_url=encode_url_safe(target_url))
+    finally:
+        # No-op if stream_summary_text already closed it; covers the
+        # client disconnecting before the stream was consumed.
+        stream.close()
+        _release_inflight(target_url)
 
 
 @app.route("/summarize", methods=["POST"])
@@ -437,10 +951,33 @@ def create_summary():
             logger.info(f"Using cached result for {target_url}")
             return redirect(f"/{encode_url_safe(target_url)}")
 
-        # Not in cache, generate a new summary
-        markdown_summary = summarize_with_claude(content)
-        store_result(target_url, title, markdown_summary)
-        return redirect(f"/{encode_url_safe(target_url)}")
+        # Coalesce concurrent misses for the same URL: the first request
+        # generates, the rest wait on its event and serve from cache.
+        with _inflight_lock:
+            pending = _inflight.get(target_url)
+            if pending is None:
+                _inflight[target_url] = threading.Event()
+        if pending is not None:
+            logger.info(f"Waiting on in-flight generation for {target_url}")
+            pending.wait(timeout=config.claude_timeout)
+            if get_cached_result(target_url):
+                return redirect(f"/{encode_url_safe(target_url)}")
+            return "Summary generation did not complete, please retry", 503
+
+        # Not in cache: stream the summary to the browser as it is
+        # generated instead of blocking until completion. The stream is
+        # opened here, before the response starts, so rate limits and
+        # other request-time failures reach the handlers below; release
+        # the in-flight slot this request just claimed if that happens.
+        try:
+            stream = open_summary_stream(content)
+        except BaseException:
+            _release_inflight(target_url)
+            raise
+        return Response(
+            stream_with_context(stream_new_summary(target_url, title, stream)),
+            mimetype="text/html",
+        )
 
     except RateLimitError as e:
         # Access the raw headers from the underlying response
@@ -474,20 +1011,142 @@ def create_summary():
         logger.error(
             f"Rate limit error for {target_url}: {error_message}", exc_info=True
         )
-        return render_template_string(
-            HTML_TEMPLATE, error=error_message, title="Rate Limit Error"
+        return _HTML_TMPL.render(
+            error=error_message, title="Rate Limit Error"
         ), 429
 
     except Exception as e:
         logger.error(f"Error processing content: {e}", exc_info=True)
-        return render_template_string(
-            HTML_TEMPLATE, error=f"Error processing request: {str(e)}", title="Error"
+        return _HTML_TMPL.render(
+            error=f"Error processing request: {str(e)}", title="Error"
         ), 500
 
 
+# Batches awaiting collection, mapping the Anthropic batch id to each
+# item's custom_id -> (url, title). Per-instance, like the rest of the
+# in-memory state: the instance that submitted a batch collects it.
+_pending_batches: dict[str, dict[str, Tuple[URL, str]]] = {}
+_pending_batches_lock = threading.Lock()
+
+
+@app.route("/batch", methods=["POST"])
+def create_batch() -> Response:
+    """Submit many summaries as one Anthropic batch job.
+
+    Batched requests run asynchronously at half the per-token cost, so
+    bulk callers should prefer this over hammering /summarize. Expects
+    {"items": [{"url", "title", "content"}, ...]}; poll
+    GET /batch/<id> to collect and store the results.
+    """
+    payload = request.get_json(silent=True) or {}
+    items = payload.get("items")
+    if not isinstance(items, list) or not items:
+        return Response("Expected a non-empty 'items' list", 400)
+
+    mapping: dict[str, Tuple[URL, str]] = {}
+    contents: dict[str, str] = {}
+    cached_count = 0
+    for item in items:
+        if not isinstance(item, dict) or not all(
+            k in item for k in ["content", "url", "title"]
+        ):
+            return Response("Each item needs url, title and content", 400)
+        target_url = get_and_validate_url(item["url"])
+        if not target_url:
+            return Response(f"Invalid URL: {item['url']}", 400)
+        if get_cached_result(target_url):
+            cached_count += 1
+            continue
+        # custom_id is capped at 64 characters, so send the blob-name
+        # hash and keep the URL/title mapping here. Keying by custom_id
+        # also dedupes repeated URLs (last occurrence wins) - the API
+        # rejects a batch containing duplicate custom_ids.
+        custom_id = get_blob_name(target_url)[: -len(".gz")]
+        mapping[custom_id] = (target_url, item["title"])
+        contents[custom_id] = item["content"]
+
+    if not mapping:
+        return Response(
+            orjson.dumps({"batch_id": None, "submitted": 0, "cached": cached_count}),
+            mimetype="application/json",
+        )
+
+    batch_requests = [
+        {"custom_id": custom_id, "params": _summary_request_params(content)}
+        for custom_id, content in contents.items()
+    ]
+    try:
+        batch = anthropic_client.messages.batches.create(requests=batch_requests)
+    except Exception as e:
+        logger.error(f"Error submitting batch: {e}", exc_info=True)
+        return Response("Error submitting batch", 500)
+    with _pending_batches_lock:
+        _pending_batches[batch.id] = mapping
+    logger.info(f"Submitted batch {batch.id} with {len(batch_requests)} requests")
+    return Response(
+        orjson.dumps(
+            {
+                "batch_id": batch.id,
+                "submitted": len(batch_requests),
+                "cached": cached_count,
+            }
+        ),
+        202,
+        mimetype="application/json",
+    )
+
+
+@app.route("/batch/<batch_id>")
+def collect_batch(batch_id: str) -> Response:
+    """Poll a batch job, storing any finished summaries"""
+    try:
+        batch = anthropic_client.messages.batches.retrieve(batch_id)
+        if batch.processing_status != "ended":
+            return Response(
+                orjson.dumps({"status": batch.processing_status}),
+                202,
+                mimetype="application/json",
+            )
+
+        # Keep the url/title mapping until every result is processed: if
+        # the results stream fails partway through, a retry must still
+        # find it. Storing a summary twice is harmless (same blob).
+        with _pending_batches_lock:
+            mapping = _pending_batches.get(batch_id, {})
+
+        stored = 0
+        failed = 0
+        for entry in anthropic_client.messages.batches.results(batch_id):
+            target = mapping.get(entry.custom_id)
+            if target is None:
+                # Submitted by another instance.
+                continue
+            if entry.result.type != "succeeded":
+                failed += 1
+                logger.error(f"Batch request {entry.custom_id}: {entry.result.type}")
+                continue
+            url, title = target
+            summary = "".join(
+                block.text
+                for block in entry.result.message.content
+                if block.type == "text"
+            )
+            store_result(url, prepare_result(url, title, summary))
+            stored += 1
+
+        with _pending_batches_lock:
+            _pending_batches.pop(batch_id, None)
+        return Response(
+            orjson.dumps({"status": "ended", "stored": stored, "failed": failed}),
+            mimetype="application/json",
+        )
+    except Exception as e:
+        logger.error(f"Error collecting batch {batch_id}: {e}", exc_info=True)
+        return Response("Error collecting batch", 500)
+
+
 @app.route("/<path:encoded_url>")
-@gzip_response
-def view_summary(encoded_url: str) -> HTMLResponse:
+def view_summary(encoded_url: str) -> HTMLResponse | Response:
     request_id = request.headers.get("X-Request-ID", "unknown")
     logger.info(f"Starting request {request_id} for encoded URL: {encoded_url}")
     start_time = time.time()
@@ -496,23 +1155,13 @@ def view_summary(encoded_url: str) -> HTMLResponse:
         url = decode_url_safe(encoded_url)
         target_url = get_and_validate_url(url)
         if not target_url:
-            return (
-                render_template_string(
-                    HTML_TEMPLATE, error="Invalid URL. Must be HTTPS.", title="Error"
-                ),
-                400,
-            )
+            return static_error_response(_INVALID_URL_PAGE, 400)
 
-        cached = get_cached_result(target_url)
-        if not cached:
-            return (
-                render_template_string(
-                    HTML_TEMPLATE, error="Summary not found", title="Error"
-                ),
-                404,
-            )
+        rendered = get_rendered_summary(target_url)
+        if not rendered:
+            return static_error_response(_NOT_FOUND_PAGE, 404)
 
-        html_summary = markdown2.markdown(cached.summary, extras=MARKDOWN_EXTRAS)
+        title, html_summary = rendered
 
         total_duration = time.time() - start_time
         logger.info(
@@ -521,9 +1170,8 @@ def view_summary(encoded_url: str) -> HTMLResponse:
         )
 
         return (
-            render_template_string(
-                HTML_TEMPLATE,
-                title=cached.title,
+            _HTML_TMPL.render(
+                title=title,
                 url=target_url,
                 summary=html_summary,
                 error=None,
@@ -539,8 +1187,7 @@ def view_summary(encoded_url: str) -> HTMLResponse:
             exc_info=True,
         )
         return (
-            render_template_string(
-                HTML_TEMPLATE,
+            _HTML_TMPL.render(
                 error=f"Error processing request: {str(e)}",
                 title="Error",
             ),
@@ -548,29 +1195,49 @@ def view_summary(encoded_url: str) -> HTMLResponse:
         )
 
 
+# Short-lived cache of the fully rendered /recent page, cleared on
+# store/delete on this instance and aged out by TTL for writes that
+# happened on other instances. Compression happens in the middleware.
+_recent_page_cache: TTLCache = TTLCache(
+    maxsize=1, ttl=int(os.environ.get("RECENT_CACHE_TTL", "60"))
+)
+_recent_page_lock = threading.Lock()
+
+
+def _invalidate_recent_page() -> None:
+    with _recent_page_lock:
+        _recent_page_cache.clear()
+
+
 @app.route("/recent")
-@gzip_response
-def recent_summaries() -> HTMLResponse:
+def recent_summaries() -> Response:
     """Show recent summaries"""
+    with _recent_page_lock:
+        page = _recent_page_cache.get("page")
+    if page is not None:
+        return Response(page, mimetype="text/html")
+
     logger.info("Fetching recent summaries")
     start_time = time.time()
     recent = get_recent_summaries(max_entries=1000)
     logger.info(f"Retrieved {len(recent)} summaries in {time.time() - start_time:.2f}s")
 
-    return (
-        render_template_string(
-            LIST_TEMPLATE,
-            summaries=[
-                {
-                    "encoded_url": encode_url_safe(url),
-                    "timestamp": timestamp,
-                    "title": url.removeprefix("https://").removesuffix("/"),
-                }
-                for url, timestamp in recent
-            ],
-        ),
-        200,
+    # One C-level join of preformatted rows; html_escape matches the
+    # autoescaping the Jinja loop used to do.
+    rows = "".join(
+        _ROW_FMT.format(
+            index=i,
+            encoded_url=html_escape(encoded_url),
+            timestamp=html_escape(timestamp),
+            title=html_escape(title),
+        )
+        for i, (encoded_url, timestamp, title) in enumerate(recent, start=1)
     )
+    page = _LIST_HEAD + rows + _LIST_TAIL
+
+    with _recent_page_lock:
+        _recent_page_cache["page"] = page
+    return Response(page, mimetype="text/html")
 
 
 @app.route("/delete/<path:encoded_url>", methods=["DELETE"])
@@ -583,13 +1250,21 @@ def delete_summary(encoded_url: str) -> Response:
             return Response("Invalid URL", 400)
 
         bucket = storage_client.bucket(config.bucket_name)
-        blob_name = get_blob_name(target_url)
-        blob = bucket.blob(blob_name)
-
-        if not blob.exists():
-            return Response("Not found", 404)
 
-        blob.delete()
+        try:
+            bucket.blob(get_blob_name(target_url)).delete()
+        except NotFound:
+            try:
+                bucket.blob(legacy_blob_name(target_url)).delete()
+            except NotFound:
+                return Response("Not found", 404)
+
+        with _result_cache_lock:
+            _result_cache.pop(target_url, None)
+        with _render_cache_lock:
+            _render_cache.pop(target_url, None)
+        remove_index_entry(target_url)
+        _invalidate_recent_page()
         return Response("Deleted", 200)
     except Exception as e:
         logger.error(f"Error deleting summary: {e}", exc_info=True)
@@ -623,4 +1298,7 @@ def favicon():
 
 
 if __name__ == "__main__":
-    app.run(host="0.0.0.0", port=int(os.environ.get("PORT", 8080)))
+    if "--rebuild-index" in sys.argv:
+        rebuild_index()
+    else:
+        app.run(host="0.0.0.0", port=int(os.environ.get("PORT", 8080)))